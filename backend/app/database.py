@@ -2,14 +2,23 @@
 
 import os
 from collections.abc import Generator
+from functools import cache
 
-import psycopg2
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 env_path = os.path.join(os.path.dirname(__file__), "..", "..", ".env")
-load_dotenv(env_path)
+
+# NOTIFY channel carrying the ID of a session whose laps were (re)imported
+LAPS_CHANGED_CHANNEL = "laps_changed"
+
+
+@cache
+def _load_env():
+    """Load the .env file once, on first database access."""
+    from dotenv import load_dotenv
+
+    load_dotenv(env_path)
 
 
 def _get_db_url() -> str:
@@ -18,6 +27,7 @@ def _get_db_url() -> str:
 
     :return: A database URL
     """
+    _load_env()
     user = os.environ["POSTGRES_USER"]
     psw = os.environ["POSTGRES_PASSWORD"]
     host = os.getenv("POSTGRES_HOST", "localhost")
@@ -26,8 +36,28 @@ def _get_db_url() -> str:
     return f"postgresql://{user}:{psw}@{host}:{port}/{db}"
 
 
-engine = create_engine(_get_db_url())
-session_maker = sessionmaker(bind=engine, expire_on_commit=False)
+@cache
+def get_engine() -> Engine:
+    """
+    Return the SQLAlchemy engine, creating it on first use.
+
+    :return: The process-wide SQLAlchemy engine
+    """
+    return create_engine(_get_db_url())
+
+
+@cache
+def _get_session_factory() -> sessionmaker[Session]:
+    return sessionmaker(bind=get_engine(), expire_on_commit=False)
+
+
+def session_maker() -> Session:
+    """
+    Return a new SQLAlchemy session bound to the lazily created engine.
+
+    :return: A new SQLAlchemy session
+    """
+    return _get_session_factory()()
 
 
 def get_connection():
@@ -36,6 +66,9 @@ def get_connection():
 
     :return: A connection to the PostgreSQL database
     """
+    import psycopg2
+
+    _load_env()
     return psycopg2.connect(
         host=os.getenv("POSTGRES_HOST", "localhost"),
         port=os.getenv("POSTGRES_PORT", "5432"),
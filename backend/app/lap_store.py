@@ -0,0 +1,253 @@
+# In-memory columnar lap store for hot sessions, filtered with NumPy masks.
+
+import os
+import threading
+from collections import OrderedDict
+from functools import cache
+from logging import getLogger
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.app.database import LAPS_CHANGED_CHANNEL, get_connection
+from backend.app.models import Driver, Lap
+from backend.app.models import Session as SessionModel
+
+logger = getLogger(__name__)
+
+INT_COLUMNS = (
+    "id",
+    "driver_id",
+    "lap_number",
+    "lap_time",
+    "sector1",
+    "sector2",
+    "sector3",
+    "tire_life",
+    "position",
+    "top_speed",
+    "brake_count",
+)
+
+
+def _encode(values: list[str | None]) -> tuple[np.ndarray, list[str]]:
+    """
+    Encode strings as integer codes into a sorted list of categories.
+
+    :param values: Strings, None for missing values
+    :return: The codes (-1 for None) and the categories they index
+    """
+    categories = sorted({v for v in values if v is not None})
+    index = {v: i for i, v in enumerate(categories)}
+    codes = np.fromiter((index.get(v, -1) for v in values), np.int16, len(values))
+    return codes, categories
+
+
+class SessionLaps:
+    """The laps of one session held as NumPy arrays, one per column."""
+
+    def __init__(self, session_id: int, rows: list):
+        """
+        :param session_id: The session ID
+        :param rows: Rows of INT_COLUMNS, full_throttle_pct, compound and driver code,
+            ordered by lap number and driver code
+        """
+        self.session_id = session_id
+        self.ints: dict[str, np.ndarray] = {}
+        self.nulls: dict[str, np.ndarray] = {}
+        columns = list(zip(*rows)) or [()] * (len(INT_COLUMNS) + 3)
+        for name, values in zip(INT_COLUMNS, columns):
+            nulls = np.fromiter((v is None for v in values), bool, len(values))
+            ints = np.fromiter((v or 0 for v in values), np.int64, len(values))
+            self.ints[name], self.nulls[name] = ints, nulls
+        throttle = columns[len(INT_COLUMNS)]
+        self.full_throttle_pct = np.array(
+            [np.nan if v is None else v for v in throttle], dtype=np.float64
+        )
+        self.compounds, self.compound_names = _encode(columns[-2])
+        self.drivers, self.driver_codes = _encode(columns[-1])
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [*self.ints.values(), *self.nulls.values()]
+        arrays += [self.full_throttle_pct, self.compounds, self.drivers]
+        return sum(a.nbytes for a in arrays)
+
+    def filter(
+        self, driver=None, compound=None, lap_min=None, lap_max=None
+    ) -> list[dict]:
+        """
+        Return the laps matching the filters of the laps endpoint.
+
+        :return: Lap dicts in the shape of LapDetailResponse
+        """
+        mask = np.ones(len(self.drivers), dtype=bool)
+        if driver:
+            mask &= self.drivers == self._category(self.driver_codes, driver)
+        if compound:
+            mask &= self.compounds == self._category(self.compound_names, compound)
+        if lap_min is not None:
+            mask &= self.ints["lap_number"] >= lap_min
+        if lap_max is not None:
+            mask &= self.ints["lap_number"] <= lap_max
+
+        columns = {
+            name: [
+                None if null else v
+                for v, null in zip(values[mask].tolist(), self.nulls[name][mask].tolist())
+            ]
+            for name, values in self.ints.items()
+        }
+        columns["full_throttle_pct"] = [
+            None if np.isnan(v) else v for v in self.full_throttle_pct[mask].tolist()
+        ]
+        columns["compound"] = [
+            self.compound_names[c] if c >= 0 else None
+            for c in self.compounds[mask].tolist()
+        ]
+        columns["driver_code"] = [
+            self.driver_codes[c] for c in self.drivers[mask].tolist()
+        ]
+
+        columns["session_id"] = [self.session_id] * len(columns["driver_code"])
+        return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+    @staticmethod
+    def _category(categories: list[str], value: str) -> int:
+        """Return the code of a filter value, -2 (matches nothing) when unknown."""
+        try:
+            return categories.index(value.upper())
+        except ValueError:
+            return -2
+
+
+class LapStore:
+    """
+    Per-process LRU cache of SessionLaps bounded by a memory budget.
+
+    Sessions are invalidated when the import pipeline sends a NOTIFY on
+    LAPS_CHANGED_CHANNEL, which is picked up on the next lookup.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._sessions: OrderedDict[int, SessionLaps] = OrderedDict()
+        self._lock = threading.Lock()
+        self._listener = None
+        # Bumped on every invalidation so that loads racing with one are dropped
+        self._generation = 0
+
+    def get(self, db: Session, session_id: int) -> SessionLaps | None:
+        """
+        Return the laps of a session, loading them on a miss.
+
+        :param db: SQLAlchemy session used to load missing sessions
+        :param session_id: The session ID
+        :return: The session laps, None if the session does not exist
+        """
+        with self._lock:
+            self._poll_invalidations()
+            laps = self._sessions.get(session_id)
+            if laps is not None:
+                self._sessions.move_to_end(session_id)
+                return laps
+            generation = self._generation
+
+        laps = self._load(db, session_id)
+        if laps is None:
+            return None
+        with self._lock:
+            if generation == self._generation:
+                self._sessions[session_id] = laps
+                self._evict()
+        return laps
+
+    def invalidate(self, session_id: int | None = None):
+        """
+        Drop a session from the store, or every session if none is given.
+
+        :param session_id: The session ID to drop
+        """
+        with self._lock:
+            self._drop(session_id)
+
+    def close(self):
+        """Close the LISTEN connection and clear the store."""
+        with self._lock:
+            self._close_listener()
+            self._drop()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(laps.nbytes for laps in self._sessions.values())
+
+    def __contains__(self, session_id: int) -> bool:
+        return session_id in self._sessions
+
+    def _load(self, db: Session, session_id: int) -> SessionLaps | None:
+        int_columns = [getattr(Lap, name) for name in INT_COLUMNS]
+        stmt = (
+            select(*int_columns, Lap.full_throttle_pct, Lap.compound, Driver.code)
+            .join(Driver, Lap.driver_id == Driver.id)
+            .where(Lap.session_id == session_id)
+            .order_by(Lap.lap_number, Driver.code)
+        )
+        rows = db.execute(stmt).all()
+        if not rows and db.get(SessionModel, session_id) is None:
+            return None
+        return SessionLaps(session_id, rows)
+
+    def _drop(self, session_id: int | None = None):
+        self._generation += 1
+        if session_id is None:
+            self._sessions.clear()
+        else:
+            self._sessions.pop(session_id, None)
+
+    def _evict(self):
+        """Drop least recently used sessions until the store fits its budget."""
+        total = self.nbytes
+        while self._sessions and total > self.max_bytes:
+            _, laps = self._sessions.popitem(last=False)
+            total -= laps.nbytes
+
+    def _poll_invalidations(self):
+        """Apply pending NOTIFY messages without blocking on the database."""
+        try:
+            if self._listener is None:
+                self._listener = get_connection()
+                self._listener.autocommit = True
+                self._listener.cursor().execute(f"LISTEN {LAPS_CHANGED_CHANNEL}")
+                # Anything may have changed while nobody was listening
+                self._drop()
+            self._listener.poll()
+        except Exception as e:
+            logger.warning(f"Lap store listener failed, clearing the store: {e}")
+            self._close_listener()
+            self._drop()
+            return
+        while self._listener.notifies:
+            payload = self._listener.notifies.pop(0).payload
+            self._drop(int(payload))
+
+    def _close_listener(self):
+        if self._listener is not None:
+            try:
+                self._listener.close()
+            except Exception:
+                pass
+            self._listener = None
+
+
+@cache
+def get_lap_store() -> LapStore | None:
+    """
+    Return the process-wide lap store, None when disabled.
+
+    Enabled by setting LAP_STORE_MB to the memory budget in megabytes.
+    """
+    budget = float(os.getenv("LAP_STORE_MB", "0"))
+    if budget <= 0:
+        return None
+    return LapStore(int(budget * 1024 * 1024))
@@ -2,7 +2,7 @@
 
 from datetime import date, datetime
 
-from sqlalchemy import Date, DateTime, Enum, Float, ForeignKey, Integer, String
+from sqlalchemy import Date, DateTime, Enum, Float, ForeignKey, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.app.database import Base
@@ -62,6 +62,8 @@ class Session(Base):
     )
 
     date: Mapped[datetime] = mapped_column(DateTime)
+    # Bumped on every load, versions the JSON snapshots of the session
+    loaded_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
     event: Mapped["Event"] = relationship(back_populates="sessions")
     laps: Mapped[list["Lap"]] = relationship(back_populates="session")
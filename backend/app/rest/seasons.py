@@ -1,6 +1,6 @@
 # Endpoints for seasons and events.
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from backend.app.database import get_db
@@ -10,6 +10,7 @@ from backend.app.schemas import (
     EventResponse,
     SeasonResponse,
 )
+from backend.app.snapshots import season_version, snapshot_response
 
 router = APIRouter(prefix="/seasons", tags=["seasons"])
 
@@ -24,20 +25,31 @@ def list_seasons(db: Session = Depends(get_db)):
     "/{year}/events",
     response_model=list[EventResponse],
 )
-def list_events(year: int, db: Session = Depends(get_db)):
+def list_events(year: int, request: Request, db: Session = Depends(get_db)):
     """Return all events for a season year"""
-    season = db.query(Season).filter(Season.year == year).first()
-    if not season:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Season {year} not found",
-        )
-    return (
+    snapshot = snapshot_response(
+        request, lambda: season_version(db, year), "seasons", year, "events"
+    )
+    if snapshot is not None:
+        return snapshot
+    return aux_season_events(db, year)
+
+
+def aux_season_events(db: Session, year: int):
+    """Query the events of a season, 404 if it does not exist"""
+    events = (
         db.query(Event)
         .filter(Event.season_year == year)
         .order_by(Event.round_number)
         .all()
     )
+    # Only tell an empty season from a missing one when there is nothing to return
+    if not events and not db.get(Season, year):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Season {year} not found",
+        )
+    return events
 
 
 @router.get(
@@ -46,10 +58,12 @@ def list_events(year: int, db: Session = Depends(get_db)):
 )
 def list_drivers(year: int, db: Session = Depends(get_db)):
     """Return all drivers for a given season"""
-    season = db.query(Season).filter(Season.year == year).first()
-    if not season:
+    drivers = (
+        db.query(Driver).filter(Driver.season_year == year).order_by(Driver.code).all()
+    )
+    if not drivers and not db.get(Season, year):
         raise HTTPException(
             status_code=404,
             detail=f"Season {year} not found",
         )
-    return db.query(Driver).filter(Driver.season_year == year).order_by(Driver.code).all()
+    return drivers
@@ -1,31 +1,109 @@
 # Endpoints for sessions, laps and drivers per session.
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from itertools import groupby
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import Integer, any_, case, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Session
 
 from backend.app.database import get_db
-from backend.app.models import Driver, Lap
+from backend.app.models import Driver, Event, Lap
 from backend.app.models import Session as SessionModel
-from backend.app.schemas import DriverResponse, LapDetailResponse
+from backend.app.schemas import (
+    DriverResponse,
+    LapDetailResponse,
+    RaceTraceResponse,
+    SessionLapsResponse,
+)
+from backend.app.snapshots import session_version, snapshot_response
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
+SessionType = Literal["FP1", "FP2", "FP3", "Q", "SQ", "S", "R"]
+
+
+@router.get(
+    "/laps",
+    response_model=list[SessionLapsResponse],
+)
+def list_batch_laps(
+    session_id: list[int] | None = Query(None, description="Session IDs (repeatable)"),
+    year: int | None = Query(None, description="Season year"),
+    session_type: SessionType | None = Query(None, description="Session type"),
+    driver: str | None = Query(None, description="Filter by driver code"),
+    compound: str | None = Query(None, description="Filter by compound"),
+    lap_min: int | None = Query(None, description="Minimum lap number"),
+    lap_max: int | None = Query(None, description="Maximum lap number"),
+    db: Session = Depends(get_db),
+):
+    """Return laps for many sessions at once, grouped by session"""
+    if not session_id and year is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Either session_id or year must be given",
+        )
+    # A whole season of every session type is too large for one response
+    if year is not None and not session_type:
+        raise HTTPException(
+            status_code=400,
+            detail="session_type must be given with year",
+        )
+
+    query = db.query(Lap, Driver.code).join(Driver, Lap.driver_id == Driver.id)
+    if session_id:
+        query = query.filter(Lap.session_id == any_(literal(session_id, ARRAY(Integer))))
+    if year is not None or session_type:
+        query = query.join(SessionModel, Lap.session_id == SessionModel.id)
+    if year is not None:
+        query = query.join(Event, SessionModel.event_id == Event.id).filter(
+            Event.season_year == year
+        )
+    if session_type:
+        query = query.filter(SessionModel.type == session_type)
+    query = aux_apply_filters(query, driver, compound, lap_min, lap_max)
+    query = query.order_by(Lap.session_id, Lap.lap_number, Driver.code)
+
+    return [
+        SessionLapsResponse(session_id=sid, laps=aux_build_resp(rows))
+        for sid, rows in groupby(query.all(), key=lambda row: row[0].session_id)
+    ]
+
 
 @router.get(
     "/{session_id}/drivers",
     response_model=list[DriverResponse],
 )
-def list_session_drivers(session_id: int, db: Session = Depends(get_db)):
+def list_session_drivers(
+    session_id: int, request: Request, db: Session = Depends(get_db)
+):
     """Return all drivers who drove in a session"""
-    session = db.get(SessionModel, session_id)
-    if not session:
+    snapshot = snapshot_response(
+        request,
+        lambda: session_version(db, session_id),
+        "sessions",
+        session_id,
+        "drivers",
+    )
+    if snapshot is not None:
+        return snapshot
+    return aux_session_drivers(db, session_id)
+
+
+def aux_session_drivers(db: Session, session_id: int):
+    """Query the drivers of a session, 404 if it does not exist"""
+    driver_ids = db.query(Lap.driver_id).filter(Lap.session_id == session_id).distinct()
+    drivers = (
+        db.query(Driver).filter(Driver.id.in_(driver_ids)).order_by(Driver.code).all()
+    )
+    # Only tell an empty session from a missing one when there is nothing to return
+    if not drivers and not db.get(SessionModel, session_id):
         raise HTTPException(
             status_code=404,
             detail=f"Session {session_id} not found",
         )
-
-    driver_ids = db.query(Lap.driver_id).filter(Lap.session_id == session_id).distinct()
-    return db.query(Driver).filter(Driver.id.in_(driver_ids)).order_by(Driver.code).all()
+    return drivers
 
 
 @router.get(
@@ -34,6 +112,7 @@ def list_session_drivers(session_id: int, db: Session = Depends(get_db)):
 )
 def list_session_laps(
     session_id: int,
+    request: Request,
     driver: str | None = Query(None, description="Filter by driver code"),
     compound: str | None = Query(None, description="Filter by compound"),
     lap_min: int | None = Query(None, description="Minimum lap number"),
@@ -41,21 +120,128 @@ def list_session_laps(
     db: Session = Depends(get_db),
 ):
     """Return laps for a session with filters"""
-    session = db.get(SessionModel, session_id)
-    if not session:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Session {session_id} not found",
+    if not (driver or compound or lap_min is not None or lap_max is not None):
+        snapshot = snapshot_response(
+            request,
+            lambda: session_version(db, session_id),
+            "sessions",
+            session_id,
+            "laps",
         )
+        if snapshot is not None:
+            return snapshot
+
+    # Imported here to keep NumPy out of the API cold start when the store is off
+    from backend.app.lap_store import get_lap_store
+
+    store = get_lap_store()
+    if store is not None:
+        laps = store.get(db, session_id)
+        if laps is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Session {session_id} not found",
+            )
+        return laps.filter(driver, compound, lap_min, lap_max)
 
+    return aux_session_laps(db, session_id, driver, compound, lap_min, lap_max)
+
+
+def aux_session_laps(
+    db: Session, session_id: int, driver=None, compound=None, lap_min=None, lap_max=None
+) -> list[LapDetailResponse]:
+    """Query the laps of a session with filters, 404 if it does not exist"""
     query = (
         db.query(Lap, Driver.code)
         .join(Driver, Lap.driver_id == Driver.id)
         .filter(Lap.session_id == session_id)
     )
     query = aux_apply_filters(query, driver, compound, lap_min, lap_max)
-    query = query.order_by(Lap.lap_number, Driver.code)
-    return aux_build_resp(query.all())
+    rows = query.order_by(Lap.lap_number, Driver.code).all()
+    if not rows and not db.get(SessionModel, session_id):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Session {session_id} not found",
+        )
+    return aux_build_resp(rows)
+
+
+@router.get(
+    "/{session_id}/race-trace",
+    response_model=RaceTraceResponse,
+)
+def get_race_trace(session_id: int, db: Session = Depends(get_db)):
+    """Return each driver's gap to the leader and position, lap by lap"""
+    by_driver = {"partition_by": Lap.driver_id, "order_by": Lap.lap_number}
+    # Laps without a time for anyone (lap 1 when FastF1 could not fill it in,
+    # red flags) are left out of every total alike, so the gaps stay comparable
+    timed = func.count(Lap.lap_time).over(partition_by=Lap.lap_number) > 0
+    laps = (
+        select(
+            Lap.driver_id,
+            Driver.code,
+            Lap.lap_number,
+            Lap.lap_time,
+            Lap.position,
+            (func.lag(Lap.position).over(**by_driver) - Lap.position).label("gained"),
+            timed.label("timed"),
+        )
+        .join(Driver, Lap.driver_id == Driver.id)
+        .where(Lap.session_id == session_id)
+        .subquery()
+    )
+    by_driver = {"partition_by": laps.c.driver_id, "order_by": laps.c.lap_number}
+    # Otherwise a cumulative time is only meaningful if none of the driver's
+    # earlier lap times is missing
+    n_times = func.count(laps.c.lap_time).filter(laps.c.timed).over(**by_driver)
+    n_laps = func.count().filter(laps.c.timed).over(**by_driver)
+    trace = select(
+        laps.c.code,
+        laps.c.lap_number,
+        case((n_times == n_laps, func.sum(laps.c.lap_time).over(**by_driver))).label(
+            "total"
+        ),
+        laps.c.position,
+        laps.c.gained,
+    ).subquery()
+    # The leader is whoever is P1 on the lap; if their total is unknown, so are the gaps
+    leader = (
+        func.max(trace.c.total)
+        .filter(trace.c.position == 1)
+        .over(partition_by=trace.c.lap_number)
+    )
+    stmt = select(
+        trace.c.code,
+        trace.c.lap_number,
+        trace.c.total - leader,
+        trace.c.position,
+        trace.c.gained,
+    ).order_by(trace.c.code, trace.c.lap_number)
+    rows = db.execute(stmt).all()
+    if not rows and not db.get(SessionModel, session_id):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Session {session_id} not found",
+        )
+
+    drivers = sorted({row[0] for row in rows})
+    laps = sorted({row[1] for row in rows})
+    driver_idx = {code: i for i, code in enumerate(drivers)}
+    lap_idx = {lap: i for i, lap in enumerate(laps)}
+    gaps = [[None] * len(laps) for _ in drivers]
+    positions = [[None] * len(laps) for _ in drivers]
+    gained = [[None] * len(laps) for _ in drivers]
+    for code, lap, gap, position, change in rows:
+        i, j = driver_idx[code], lap_idx[lap]
+        gaps[i][j], positions[i][j], gained[i][j] = gap, position, change
+    return RaceTraceResponse(
+        session_id=session_id,
+        drivers=drivers,
+        laps=laps,
+        gaps=gaps,
+        positions=positions,
+        positions_gained=gained,
+    )
 
 
 def aux_apply_filters(query, driver, compound, lap_min, lap_max):
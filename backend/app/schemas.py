@@ -63,3 +63,19 @@ class LapResponse(BaseModel):
 
 class LapDetailResponse(LapResponse):
     driver_code: str
+
+
+class SessionLapsResponse(BaseModel):
+    session_id: int
+    laps: list[LapDetailResponse]
+
+
+class RaceTraceResponse(BaseModel):
+    """Per-driver rows, per-lap columns. None where a driver has no value."""
+
+    session_id: int
+    drivers: list[str]
+    laps: list[int]
+    gaps: list[list[int | None]]
+    positions: list[list[int | None]]
+    positions_gained: list[list[int | None]]
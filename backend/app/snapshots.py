@@ -0,0 +1,141 @@
+# Pre-rendered gzipped JSON responses for completed sessions, served from disk.
+
+import gzip
+import os
+import tempfile
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from backend.app.models import Event
+from backend.app.models import Session as SessionModel
+
+
+def get_snapshot_dir() -> Path | None:
+    """
+    Return the snapshot directory, None when snapshots are disabled.
+
+    Enabled by setting SNAPSHOT_DIR.
+    """
+    path = os.getenv("SNAPSHOT_DIR")
+    return Path(path) if path else None
+
+
+def snapshot_version(loaded_at: datetime | None) -> str | None:
+    """
+    Return the version a snapshot is stored under.
+
+    Every load of a session stamps it with a new loaded_at, so snapshots
+    rendered before a reload or a database reset are never served again.
+
+    :param loaded_at: When the data of the snapshot was loaded
+    :return: The version, None if there is no data
+    """
+    return loaded_at.strftime("%Y%m%d%H%M%S%f") if loaded_at else None
+
+
+def session_version(db: Session, session_id: int) -> str | None:
+    """
+    Return the current snapshot version of a session.
+
+    :param db: SQLAlchemy session
+    :param session_id: The session ID
+    :return: The version, None if the session does not exist
+    """
+    stmt = select(SessionModel.loaded_at).where(SessionModel.id == session_id)
+    return snapshot_version(db.scalar(stmt))
+
+
+def season_version(db: Session, year: int) -> str | None:
+    """
+    Return the current snapshot version of a season, from its latest load.
+
+    :param db: SQLAlchemy session
+    :param year: The season year
+    :return: The version, None if the season has no sessions
+    """
+    stmt = (
+        select(func.max(SessionModel.loaded_at))
+        .join(Event)
+        .where(Event.season_year == year)
+    )
+    return snapshot_version(db.scalar(stmt))
+
+
+def snapshot_path(version: str, *parts: str | int) -> Path | None:
+    """
+    Return where the snapshot of a response lives.
+
+    :param version: The snapshot version
+    :param parts: Path parts of the response, e.g. ("sessions", 12, "laps")
+    :return: The path of the gzipped JSON file, None when snapshots are disabled
+    """
+    root = get_snapshot_dir()
+    if root is None:
+        return None
+    *dirs, name = (str(p) for p in parts)
+    return root.joinpath(*dirs, f"{name}.{version}.json.gz")
+
+
+def snapshot_response(
+    request: Request, version: Callable[[], str | None], *parts: str | int
+) -> Response | None:
+    """
+    Return a snapshot as a response, if it is current and the client takes gzip.
+
+    :param request: The incoming request
+    :param version: Returns the current version, only called when snapshots are on
+    :param parts: Path parts of the response, e.g. ("sessions", 12, "laps")
+    :return: The response, None to fall back to the database
+    """
+    if "gzip" not in request.headers.get("accept-encoding", ""):
+        return None
+    if get_snapshot_dir() is None:
+        return None
+    current = version()
+    if current is None:
+        return None
+    try:
+        # Read rather than stream, the file may be replaced by a newer version
+        content = snapshot_path(current, *parts).read_bytes()
+    except FileNotFoundError:
+        return None
+    return Response(
+        content,
+        media_type="application/json",
+        headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+    )
+
+
+def write_snapshot(content: bytes, version: str, *parts: str | int) -> Path:
+    """
+    Atomically write a gzipped JSON snapshot, removing its older versions.
+
+    :param content: The JSON body
+    :param version: The snapshot version
+    :param parts: Path parts of the response, e.g. ("sessions", 12, "laps")
+    :return: The path of the written file
+    """
+    path = snapshot_path(version, *parts)
+    if path is None:
+        raise RuntimeError("SNAPSHOT_DIR is not set")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Rename into place so that workers never serve a partial file
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(gzip.compress(content, mtime=0))
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    name = str(parts[-1])
+    for old in path.parent.glob(f"{name}.*.json.gz"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return path
@@ -20,6 +20,7 @@ CREATE TABLE sessions (
     event_id INTEGER NOT NULL REFERENCES events(id),
     type session_type NOT NULL,
     date TIMESTAMP NOT NULL,
+    loaded_at TIMESTAMP NOT NULL DEFAULT now(),
     UNIQUE (event_id, type)
 );
 
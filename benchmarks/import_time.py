@@ -0,0 +1,73 @@
+# Import-time benchmark for the API and pipeline entry points (python -X importtime).
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = {
+    "api": "backend.app.main",
+    "pipeline": "pipeline.import_data",
+}
+
+
+def measure(module: str) -> dict:
+    """
+    Import a module in a fresh interpreter and collect -X importtime output.
+
+    :param module: Dotted name of the module to import
+    :return: Cumulative import time and the heaviest direct imports (us)
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    children, total = {}, 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        # Imports are printed after their children, indented two spaces per level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children[name.strip()] = int(cumulative)
+        elif depth == 0:
+            if name.strip() == module:
+                total = int(cumulative)
+                break
+            children = {}
+    return {
+        "total_us": total,
+        "top": dict(sorted(children.items(), key=lambda kv: -kv[1])[:10]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-n", "--repeat", type=int, default=5, help="Runs per entry point"
+    )
+    parser.add_argument("-o", "--output", type=Path, help="Write the results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for name, module in ENTRY_POINTS.items():
+        runs = [measure(module) for _ in range(args.repeat)]
+        best = min(runs, key=lambda r: r["total_us"])
+        results[name] = {"module": module, **best}
+        print(f"{name:<10} {module:<25} {best['total_us'] / 1000:8.1f} ms")
+        for mod, us in best["top"].items():
+            print(f"    {mod:<35} {us / 1000:8.1f} ms")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
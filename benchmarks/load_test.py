@@ -0,0 +1,228 @@
+# HTTP load test of the API on a local uvicorn, reporting latency percentiles.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from statistics import quantiles
+
+import httpx
+
+from backend.app.database import session_maker
+from backend.app.models import Driver, Event, Lap
+from backend.app.models import Session as SessionModel
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Route name -> URL template, filled from the seeded data
+ROUTES = {
+    "seasons": "/seasons",
+    "events": "/seasons/{year}/events",
+    "season_drivers": "/seasons/{year}/drivers",
+    "session_drivers": "/sessions/{session_id}/drivers",
+    "laps": "/sessions/{session_id}/laps",
+    "laps_driver": "/sessions/{session_id}/laps?driver={driver}",
+    "laps_range": "/sessions/{session_id}/laps?lap_min=10&lap_max=20",
+    "race_trace": "/sessions/{session_id}/race-trace",
+    "batch_laps": "/sessions/laps?year={year}&session_type=R&driver={driver}",
+}
+
+DEFAULT_MIX = {
+    "seasons": 1,
+    "events": 2,
+    "season_drivers": 1,
+    "session_drivers": 2,
+    "laps": 4,
+    "laps_driver": 3,
+    "laps_range": 2,
+    "race_trace": 2,
+    "batch_laps": 1,
+}
+
+
+def load_targets(years: list[int] | None) -> list[dict]:
+    """
+    Collect the sessions (with a driver of each) that requests are drawn from.
+
+    :param years: Only use these seasons, all if None
+    :return: One dict of URL template values per session
+    """
+    db = session_maker()
+    try:
+        query = (
+            db.query(Event.season_year, SessionModel.id, Driver.code)
+            .join(SessionModel, SessionModel.event_id == Event.id)
+            .join(Lap, Lap.session_id == SessionModel.id)
+            .join(Driver, Lap.driver_id == Driver.id)
+            .distinct()
+        )
+        if years:
+            query = query.filter(Event.season_year.in_(years))
+        targets = {}
+        for year, session_id, driver in query.all():
+            target = targets.setdefault(
+                session_id, {"year": year, "session_id": session_id, "drivers": []}
+            )
+            target["drivers"].append(driver)
+        return list(targets.values())
+    finally:
+        db.close()
+
+
+def make_url(route: str, targets: list[dict]) -> str:
+    target = random.choice(targets)
+    return ROUTES[route].format(driver=random.choice(target["drivers"]), **target)
+
+
+async def run_level(
+    url: str, mix: dict[str, int], targets: list[dict], concurrency: int, duration: float
+) -> dict:
+    """
+    Keep `concurrency` requests in flight for `duration` seconds.
+
+    :return: Throughput, latency percentiles and error rate, overall and per route
+    """
+    routes, weights = zip(*mix.items())
+    results = {route: [] for route in routes}
+    errors = {route: 0 for route in routes}
+    deadline = time.perf_counter() + duration
+
+    async def worker(client: httpx.AsyncClient):
+        while time.perf_counter() < deadline:
+            route = random.choices(routes, weights)[0]
+            start = time.perf_counter()
+            try:
+                resp = await client.get(make_url(route, targets))
+                await resp.aread()
+                ok = resp.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            results[route].append(time.perf_counter() - start)
+            errors[route] += not ok
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    def summary(latencies: list[float], n_errors: int) -> dict:
+        if not latencies:
+            return {"requests": 0}
+        cuts = quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        return {
+            "requests": len(latencies),
+            "throughput_rps": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(cuts[49] * 1000, 2),
+            "p95_ms": round(cuts[94] * 1000, 2),
+            "p99_ms": round(cuts[98] * 1000, 2),
+            "error_rate": round(n_errors / len(latencies), 4),
+        }
+
+    everything = [latency for latencies in results.values() for latency in latencies]
+    return {
+        "concurrency": concurrency,
+        **summary(everything, sum(errors.values())),
+        "routes": {route: summary(results[route], errors[route]) for route in routes},
+    }
+
+
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    """Start uvicorn on the API and wait until /health answers."""
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "backend.app.main:app",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ],
+        cwd=ROOT,
+    )
+    for _ in range(100):
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        if proc.poll() is not None:
+            break
+        time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("uvicorn did not start")
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for item in value.split(","):
+        route, _, weight = item.partition("=")
+        if route not in ROUTES:
+            raise argparse.ArgumentTypeError(f"Unknown route: {route}")
+        mix[route] = int(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API")
+    parser.add_argument("--url", help="Test a running server instead of starting one")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--years", type=int, nargs="+", help="Seasons to draw from")
+    parser.add_argument(
+        "--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. laps=4,race_trace=1"
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per level")
+    parser.add_argument("--warmup", type=float, default=2, help="Seconds of warmup")
+    parser.add_argument("-o", "--output", type=Path, help="Write the results as JSON")
+    args = parser.parse_args()
+
+    targets = load_targets(args.years)
+    if not targets:
+        sys.exit("No sessions with laps in the database, import some data first")
+
+    server = None if args.url else start_server(args.port, args.workers)
+    url = args.url or f"http://127.0.0.1:{args.port}"
+    try:
+        asyncio.run(run_level(url, args.mix, targets, max(args.concurrency), args.warmup))
+        levels = []
+        for concurrency in args.concurrency:
+            level = asyncio.run(
+                run_level(url, args.mix, targets, concurrency, args.duration)
+            )
+            levels.append(level)
+            print(
+                f"c={concurrency:<4} {level['throughput_rps']:>8} req/s"
+                f"  p50 {level['p50_ms']:>8} ms  p95 {level['p95_ms']:>8} ms"
+                f"  p99 {level['p99_ms']:>8} ms  errors {level['error_rate']:.2%}"
+            )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if args.output:
+        settings = {k: os.getenv(k) for k in ("LAP_STORE_MB", "SNAPSHOT_DIR")}
+        config = {
+            "url": url,
+            "workers": None if args.url else args.workers,
+            "mix": args.mix,
+            "duration": args.duration,
+            "sessions": len(targets),
+            "settings": settings,
+        }
+        args.output.write_text(json.dumps({"config": config, "levels": levels}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# Lap-time feature matrices streamed from PostgreSQL in fixed-size chunks.
+
+import numpy as np
+
+from backend.app.database import get_connection
+
+# Feature columns, in matrix order
+FEATURES = (
+    "lap_number",
+    "tire_life",
+    "compound",
+    "position",
+    "sector1",
+    "sector2",
+    "sector3",
+    "top_speed",
+    "full_throttle_pct",
+    "brake_count",
+)
+
+# Ordinal encoding of tyre compounds, from softest to wettest
+COMPOUNDS = ("SOFT", "MEDIUM", "HARD", "INTERMEDIATE", "WET")
+
+_COMPOUND_SQL = "CASE l.compound {} END".format(
+    " ".join(f"WHEN '{c}' THEN {i}" for i, c in enumerate(COMPOUNDS))
+)
+
+_FROM_SQL = """
+    FROM laps l
+    JOIN sessions s ON s.id = l.session_id
+    JOIN events e ON e.id = s.event_id
+    WHERE e.season_year = ANY(%(years)s)
+      AND (%(types)s::session_type[] IS NULL OR s.type = ANY(%(types)s::session_type[]))
+      AND l.lap_time IS NOT NULL
+"""
+
+_SELECT_SQL = f"""
+    SELECT l.lap_time, l.session_id, l.lap_number, l.tire_life, {_COMPOUND_SQL},
+           l.position, l.sector1, l.sector2, l.sector3,
+           l.top_speed, l.full_throttle_pct, l.brake_count
+    {_FROM_SQL}
+    ORDER BY l.session_id, l.id
+"""
+
+
+def build_feature_matrix(
+    years: list[int],
+    session_types: list[str] | None = None,
+    chunk_size: int = 50_000,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build the lap-time feature matrix for the given seasons.
+
+    Rows are streamed through a server-side cursor chunk by chunk into
+    preallocated arrays, so peak memory is the matrix plus one chunk.
+    Missing values are NaN.
+
+    :param years: The season years to include
+    :param session_types: Session types to include ("R", "Q", ...), all if None
+    :param chunk_size: Number of rows fetched per round trip
+    :return: The features (n_laps x len(FEATURES)), the lap times in ms and the
+        session ID of each lap (for grouped cross-validation)
+    """
+    params = {"years": list(years), "types": session_types}
+    con = get_connection()
+    # Count and fetch must see the same rows
+    con.set_session(isolation_level="REPEATABLE READ", readonly=True)
+    try:
+        with con.cursor() as cur:
+            cur.execute(f"SELECT count(*) {_FROM_SQL}", params)
+            n = cur.fetchone()[0]
+
+        X = np.empty((n, len(FEATURES)), dtype=np.float32)
+        y = np.empty(n, dtype=np.float32)
+        groups = np.empty(n, dtype=np.int32)
+
+        with con.cursor(name="ml_features") as cur:
+            cur.itersize = chunk_size
+            cur.execute(_SELECT_SQL, params)
+            start = 0
+            while rows := cur.fetchmany(chunk_size):
+                chunk = np.array(rows, dtype=np.float64)
+                end = start + len(chunk)
+                y[start:end] = chunk[:, 0]
+                groups[start:end] = chunk[:, 1]
+                X[start:end] = chunk[:, 2:]
+                start = end
+    finally:
+        con.close()
+    return X, y, groups
@@ -0,0 +1,70 @@
+# Lap-time model training on top of the chunked feature matrix builder.
+
+import argparse
+from logging import INFO, basicConfig, getLogger
+
+import numpy as np
+from joblib import Parallel, delayed, dump
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import GroupKFold
+
+from ml.features import build_feature_matrix
+
+basicConfig(level=INFO)
+logger = getLogger(__name__)
+
+
+def _fit_fold(X: np.ndarray, y: np.ndarray, train, test) -> float:
+    """
+    Fit a model on one cross-validation fold.
+
+    :return: The mean absolute error on the held-out laps, in ms
+    """
+    model = HistGradientBoostingRegressor().fit(X[train], y[train])
+    return mean_absolute_error(y[test], model.predict(X[test]))
+
+
+def train(
+    years: list[int],
+    session_types: list[str] | None = None,
+    n_splits: int = 5,
+    n_jobs: int = -1,
+    output: str = "lap_time_model.joblib",
+) -> list[float]:
+    """
+    Train a lap-time regressor and save it with joblib.
+
+    Cross-validation folds are split by session, so no session is seen both
+    in training and evaluation, and are fitted in parallel with joblib.
+
+    :param years: The season years to train on
+    :param session_types: Session types to include, all if None
+    :param n_splits: Number of cross-validation folds
+    :param n_jobs: Number of parallel joblib workers (-1 for all cores)
+    :param output: Path of the saved model
+    :return: The mean absolute error of each fold, in ms
+    """
+    X, y, groups = build_feature_matrix(years, session_types)
+    logger.info(f"Built feature matrix: {X.shape[0]} laps")
+
+    folds = GroupKFold(n_splits=n_splits).split(X, y, groups)
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_fold)(X, y, train_idx, test_idx) for train_idx, test_idx in folds
+    )
+    logger.info(f"Cross-validation MAE: {np.mean(scores):.0f} ms")
+
+    dump(HistGradientBoostingRegressor().fit(X, y), output)
+    logger.info(f"Saved model to {output}")
+    return scores
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the lap-time model")
+    parser.add_argument("years", type=int, nargs="+", help="Season years")
+    parser.add_argument("--types", nargs="+", help="Session types (R, Q, ...)")
+    parser.add_argument("--splits", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=-1)
+    parser.add_argument("--output", default="lap_time_model.joblib")
+    args = parser.parse_args()
+    train(args.years, args.types, args.splits, args.jobs, args.output)
@@ -0,0 +1,174 @@
+# Season-wide export of laps and pit stops to compressed CSV or Parquet files.
+
+import argparse
+import gzip
+from logging import INFO, basicConfig, getLogger
+from pathlib import Path
+
+from backend.app.database import get_connection
+
+basicConfig(level=INFO)
+logger = getLogger(__name__)
+
+_SESSION_FILTER = """
+    e.season_year = %(year)s
+    AND (%(types)s::session_type[] IS NULL OR s.type = ANY(%(types)s::session_type[]))
+"""
+
+# Exported datasets: name -> (query, Parquet column types)
+EXPORTS = {
+    "laps": (
+        f"""
+        SELECT e.season_year, e.round_number, e.name AS event, s.type::text AS session,
+               d.code AS driver, d.team, l.lap_number, l.lap_time,
+               l.sector1, l.sector2, l.sector3, l.compound, l.tire_life, l.position,
+               l.top_speed, l.full_throttle_pct, l.brake_count
+        FROM laps l
+        JOIN drivers d ON d.id = l.driver_id
+        JOIN sessions s ON s.id = l.session_id
+        JOIN events e ON e.id = s.event_id
+        WHERE {_SESSION_FILTER}
+        ORDER BY e.round_number, s.type, l.lap_number, d.code
+        """,
+        {
+            "season_year": "int32",
+            "round_number": "int32",
+            "event": "string",
+            "session": "string",
+            "driver": "string",
+            "team": "string",
+            "lap_number": "int32",
+            "lap_time": "int32",
+            "sector1": "int32",
+            "sector2": "int32",
+            "sector3": "int32",
+            "compound": "string",
+            "tire_life": "int32",
+            "position": "int32",
+            "top_speed": "int32",
+            "full_throttle_pct": "float32",
+            "brake_count": "int32",
+        },
+    ),
+    "pit_stops": (
+        f"""
+        SELECT e.season_year, e.round_number, e.name AS event, s.type::text AS session,
+               d.code AS driver, d.team, p.lap_number, p.duration
+        FROM pit_stops p
+        JOIN drivers d ON d.id = p.driver_id
+        JOIN sessions s ON s.id = p.session_id
+        JOIN events e ON e.id = s.event_id
+        WHERE {_SESSION_FILTER}
+        ORDER BY e.round_number, s.type, p.lap_number, d.code
+        """,
+        {
+            "season_year": "int32",
+            "round_number": "int32",
+            "event": "string",
+            "session": "string",
+            "driver": "string",
+            "team": "string",
+            "lap_number": "int32",
+            "duration": "int32",
+        },
+    ),
+}
+
+
+def export_season(
+    year: int,
+    out_dir: str | Path = ".",
+    session_types: list[str] | None = None,
+    fmt: str = "csv",
+    chunk_size: int = 100_000,
+) -> list[Path]:
+    """
+    Export the laps and pit stops of a season, one file per dataset.
+
+    Rows are streamed from the database (COPY TO STDOUT for CSV, a named
+    server-side cursor for Parquet), so memory use does not grow with the
+    size of the season.
+
+    :param year: The season year
+    :param out_dir: Directory the files are written to
+    :param session_types: Session types to export ("R", "Q", ...), all if None
+    :param fmt: "csv" for gzipped CSV or "parquet" for zstd-compressed Parquet
+    :param chunk_size: Rows per Parquet row group
+    :return: The paths of the written files
+    """
+    if fmt not in ("csv", "parquet"):
+        raise ValueError(f"Unknown export format: {fmt}")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    params = {"year": year, "types": session_types}
+
+    paths = []
+    con = get_connection()
+    # Both datasets are read from the same snapshot
+    con.set_session(isolation_level="REPEATABLE READ", readonly=True)
+    try:
+        for name, (query, columns) in EXPORTS.items():
+            if fmt == "csv":
+                path = out_dir / f"{year}_{name}.csv.gz"
+                _export_csv(con, query, params, path)
+            else:
+                path = out_dir / f"{year}_{name}.parquet"
+                _export_parquet(con, query, params, columns, path, chunk_size)
+            logger.info(f"Exported: {path}")
+            paths.append(path)
+    finally:
+        con.close()
+    return paths
+
+
+def _export_csv(con, query: str, params: dict, path: Path):
+    """
+    Stream a query to a gzipped CSV file with COPY TO STDOUT.
+
+    :param con: Database connection
+    :param query: The SELECT query to export
+    :param params: The query parameters
+    :param path: The output file
+    """
+    with con.cursor() as cur, gzip.open(path, "wb") as f:
+        copy = cur.mogrify(query, params).decode()
+        cur.copy_expert(f"COPY ({copy}) TO STDOUT WITH (FORMAT csv, HEADER)", f)
+
+
+def _export_parquet(
+    con, query: str, params: dict, columns: dict[str, str], path: Path, chunk_size: int
+):
+    """
+    Stream a query to a Parquet file, one row group per fetched chunk.
+
+    :param con: Database connection
+    :param query: The SELECT query to export
+    :param params: The query parameters
+    :param columns: Column names and Arrow types, in query order
+    :param path: The output file
+    :param chunk_size: Rows fetched per round trip and written per row group
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(name, pa.type_for_alias(t)) for name, t in columns.items()])
+    with con.cursor(name=f"export_{path.stem}") as cur:
+        cur.itersize = chunk_size
+        cur.execute(query, params)
+        with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+            while rows := cur.fetchmany(chunk_size):
+                values = zip(*rows)
+                arrays = [pa.array(v, type=f.type) for v, f in zip(values, schema)]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export seasons of laps and pit stops")
+    parser.add_argument("years", type=int, nargs="+", help="Season years")
+    parser.add_argument("--types", nargs="+", help="Session types (R, Q, ...)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--output", default="exports", help="Output directory")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    args = parser.parse_args()
+    for year in args.years:
+        export_season(year, args.output, args.types, args.format, args.chunk_size)
@@ -0,0 +1,69 @@
+# Extract stage: FastF1 sessions to DB-ready Parquet files, without touching Postgres.
+
+import argparse
+from logging import INFO, basicConfig, getLogger
+from pathlib import Path
+
+from pipeline.import_data import FRAMES, extract_frames, fetch_session, season_sessions
+
+basicConfig(level=INFO)
+logger = getLogger(__name__)
+
+EXTRACT_DIR = "./extracts"
+
+
+def extract_session(
+    year: int, event_name: str, session_type: str, out_dir: str | Path = EXTRACT_DIR
+) -> Path:
+    """
+    Extract a session from FastF1 into a directory of Parquet files.
+
+    :param year: The season year
+    :param event_name: The name of the event ("Silverstone", "Monza", etc)
+    :param session_type: The type of session, one of TYPE_TABLE values
+    :param out_dir: Root directory of the extracts
+    :return: The session directory, <out_dir>/<year>/<round>_<type>
+    """
+    frames = extract_frames(fetch_session(year, event_name, session_type), year)
+    event = frames["event"].iloc[0]
+    path = Path(
+        out_dir, str(year), f"{event['round_number']:02d}_{event['session_type']}"
+    )
+    write_frames(frames, path)
+    logger.info(f"Extracted: {year} {event_name} {session_type} to {path}")
+    return path
+
+
+def write_frames(frames: dict, path: Path):
+    """
+    Write the frames of one session as Parquet files.
+
+    :param frames: A frame for each of FRAMES
+    :param path: The session directory
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    for name in FRAMES:
+        frames[name].to_parquet(path / f"{name}.parquet", index=False)
+
+
+def extract_season(year: int, out_dir: str | Path = EXTRACT_DIR):
+    """
+    Extract all sessions of a season.
+
+    :param year: The season year
+    :param out_dir: Root directory of the extracts
+    """
+    for event_name, st in season_sessions(year):
+        try:
+            extract_session(year, event_name, st, out_dir)
+        except Exception as e:
+            logger.warning(f"Skipped {event_name} {st}: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract seasons from FastF1")
+    parser.add_argument("years", type=int, nargs="+", help="Season years")
+    parser.add_argument("--output", default=EXTRACT_DIR, help="Extracts directory")
+    args = parser.parse_args()
+    for year in args.years:
+        extract_season(year, args.output)
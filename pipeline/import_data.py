@@ -1,21 +1,15 @@
 # F1 Data Import Pipeline to feed database with session data from FastF1.
 
+import os
+from functools import cache
 from logging import INFO, basicConfig, getLogger
 
-import numpy as np
-import pandas as pd
-from fastf1 import Cache, get_event_schedule, get_session
-from psycopg2.extensions import AsIs, register_adapter
-
-from backend.app.database import get_connection
-
-register_adapter(np.int64, lambda v: AsIs(int(v)))
-register_adapter(np.float64, lambda v: AsIs(float(v)))
+from backend.app.database import LAPS_CHANGED_CHANNEL, get_connection, session_maker
 
 basicConfig(level=INFO)
 logger = getLogger(__name__)
 
-Cache.enable_cache("./ff1_cache")
+CACHE_DIR = "./ff1_cache"
 
 # Mapping of FastF1 session names to database names
 TYPE_TABLE = {
@@ -28,6 +22,50 @@ TYPE_TABLE = {
     "Race": "R",
 }
 
+# Database columns of the laps and pit_stops tables, after session_id
+LAP_COLUMNS = (
+    "driver_id",
+    "lap_number",
+    "lap_time",
+    "sector1",
+    "sector2",
+    "sector3",
+    "compound",
+    "tire_life",
+    "position",
+    "top_speed",
+    "full_throttle_pct",
+    "brake_count",
+)
+PIT_COLUMNS = ("driver_id", "lap_number", "duration")
+
+
+# Frames produced by the extract stage and consumed by the load stage
+FRAMES = ("event", "drivers", "laps", "pit_stops")
+
+
+@cache
+def _setup():
+    """
+    Enable the FastF1 cache.
+
+    Deferred until the first import so that loading this module stays cheap.
+    """
+    from fastf1 import Cache
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    Cache.enable_cache(CACHE_DIR)
+
+
+@cache
+def _register_adapters():
+    """Let psycopg2 send numpy scalars."""
+    import numpy as np
+    from psycopg2.extensions import AsIs, register_adapter
+
+    register_adapter(np.int64, lambda v: AsIs(int(v)))
+    register_adapter(np.float64, lambda v: AsIs(float(v)))
+
 
 def import_session(year: int, event_name: str, session_type: str):
     """
@@ -38,22 +76,100 @@ def import_session(year: int, event_name: str, session_type: str):
     :param session_type: The type of session, one of TYPE_TABLE values
     :raises Exception: If any database operation fails, rolls back and raises
     """
+    load_frames(extract_frames(fetch_session(year, event_name, session_type), year))
+    logger.info(f"Imported: {year} {event_name} {session_type}")
+
+
+def fetch_session(year: int, event_name: str, session_type: str):
+    """
+    Load a session from FastF1, with laps and telemetry.
+
+    :param year: The season year
+    :param event_name: The name of the event ("Silverstone", "Monza", etc)
+    :param session_type: The type of session, one of TYPE_TABLE values
+    :return: FastF1 session object
+    """
+    from fastf1 import get_session
+
+    _setup()
     session = get_session(year, event_name, session_type)
     session.load()
+    return session
+
+
+def extract_frames(session, year: int) -> dict:
+    """
+    Extract a FastF1 session into database-ready frames.
+
+    Drivers are identified by their code, database IDs are only resolved
+    when the frames are loaded.
+
+    :param session: FastF1 session object
+    :param year: The season year
+    :return: A frame for each of FRAMES
+    """
+    import pandas as pd
+
+    event = session.event
+    results = session.results
+    drivers = pd.DataFrame(
+        {
+            "code": results["Abbreviation"],
+            "name": results["FullName"],
+            "team": results["TeamName"],
+        }
+    )
+    laps = session.laps
+    laps = laps[laps["Driver"].isin(drivers["code"])]
+    return {
+        "event": pd.DataFrame(
+            {
+                "season_year": [year],
+                "round_number": [int(event["RoundNumber"])],
+                "name": [event["EventName"]],
+                "country": [event["Country"]],
+                "circuit": [event["Location"]],
+                "event_date": [event["EventDate"]],
+                "session_type": [TYPE_TABLE.get(session.name, session.name)],
+                "session_date": [session.date],
+            }
+        ),
+        "drivers": drivers.reset_index(drop=True),
+        "laps": _transform_laps(laps).join(_lap_telemetry(laps)).reset_index(drop=True),
+        "pit_stops": _transform_pits(laps).reset_index(drop=True),
+    }
+
+
+def load_frames(frames: dict) -> int:
+    """
+    Load the frames of one session into the database, in one transaction.
+
+    Laps and pit stops already stored for the session are replaced.
+
+    :param frames: A frame for each of FRAMES, as returned by extract_frames
+    :return: The db ID of the session
+    :raises Exception: If any database operation fails, rolls back and raises
+    """
+    _register_adapters()
+    event = frames["event"].iloc[0]
+    year = int(event["season_year"])
 
     con = get_connection()
     cur = con.cursor()
 
     try:
         _insert_season(cur, year)
-        event_id = _insert_event(cur, session, year)
-        session_id = _insert_session(cur, session, event_id)
-        driver_ids = _insert_drivers(cur, session, year)
-        _insert_laps(cur, session, session_id, driver_ids)
-        _insert_pits(cur, session, session_id, driver_ids)
+        event_id = _insert_event(cur, event)
+        session_id = _insert_session(cur, event, event_id)
+        driver_ids = _insert_drivers(cur, frames["drivers"], year)
+        cur.execute("DELETE FROM laps WHERE session_id = %s", (session_id,))
+        cur.execute("DELETE FROM pit_stops WHERE session_id = %s", (session_id,))
+        _insert_laps(cur, frames["laps"], session_id, driver_ids)
+        _insert_pits(cur, frames["pit_stops"], session_id, driver_ids)
+        # Delivered on commit, tells API workers to drop cached laps
+        cur.execute("SELECT pg_notify(%s, %s)", (LAPS_CHANGED_CHANNEL, str(session_id)))
 
         con.commit()
-        logger.info(f"Imported: {year} {event_name} {session_type}")
     except Exception as e:
         con.rollback()
         raise e
@@ -61,6 +177,32 @@ def import_session(year: int, event_name: str, session_type: str):
         cur.close()
         con.close()
 
+    _render_snapshots(session_id, year)
+    return session_id
+
+
+def _render_snapshots(session_id: int, year: int):
+    """
+    Refresh the static JSON snapshots of an imported session, if enabled.
+
+    Without SNAPSHOT_DIR the snapshots are left on disk, but they are
+    versioned by loaded_at and no longer served once the session is reloaded.
+
+    :param session_id: The db ID of the session
+    :param year: The season year
+    """
+    from backend.app.snapshots import get_snapshot_dir
+    from pipeline.snapshots import write_season_snapshots, write_session_snapshots
+
+    if get_snapshot_dir() is None:
+        return
+    db = session_maker()
+    try:
+        write_session_snapshots(db, session_id)
+        write_season_snapshots(db, year)
+    finally:
+        db.close()
+
 
 def _insert_season(cur, year: int):
     """
@@ -72,16 +214,14 @@ def _insert_season(cur, year: int):
     cur.execute("INSERT INTO seasons (year) VALUES (%s) ON CONFLICT DO NOTHING", (year,))
 
 
-def _insert_event(cur, session, year: int) -> int:
+def _insert_event(cur, event) -> int:
     """
     Insert an event into the database and return its ID.
 
     :param cur: Database cursor
-    :param session: FastF1 session object
-    :param year: The season year
+    :param event: Row of the extracted event frame
     :return: The database ID of the inserted/existing event
     """
-    event = session.event
     cur.execute(
         """
         INSERT INTO events (season_year, round_number, name, country, circuit, event_date)
@@ -90,12 +230,12 @@ def _insert_event(cur, session, year: int) -> int:
         RETURNING id
         """,
         (
-            year,
-            event["RoundNumber"],
-            event["EventName"],
-            event["Country"],
-            event["Location"],
-            event["EventDate"],
+            event["season_year"],
+            event["round_number"],
+            event["name"],
+            event["country"],
+            event["circuit"],
+            event["event_date"],
         ),
     )
     row = cur.fetchone()
@@ -103,52 +243,46 @@ def _insert_event(cur, session, year: int) -> int:
         return row[0]
     cur.execute(
         "SELECT id FROM events WHERE season_year = %s AND round_number = %s",
-        (year, event["RoundNumber"]),
+        (event["season_year"], event["round_number"]),
     )
     return cur.fetchone()[0]
 
 
-def _insert_session(cur, session, event_id: int) -> int:
+def _insert_session(cur, event, event_id: int) -> int:
     """
     Insert a session into the database and return its ID.
 
+    An existing session is stamped with a new loaded_at instead, which
+    retires the snapshots rendered from its previous load.
+
     :param cur: Database cursor
-    :param session: FastF1 session object
+    :param event: Row of the extracted event frame
     :param event_id: The database ID of the parent event
-    :return: The ID of the new session
+    :return: The ID of the new or existing session
     """
-    session_type = TYPE_TABLE.get(session.name, session.name)
     cur.execute(
         """
         INSERT INTO sessions (event_id, type, date)
         VALUES (%s, %s, %s)
-        ON CONFLICT (event_id, type) DO NOTHING
+        ON CONFLICT (event_id, type) DO UPDATE SET loaded_at = now()
         RETURNING id
         """,
-        (event_id, session_type, session.date),
-    )
-    row = cur.fetchone()
-    if row:
-        return row[0]
-    cur.execute(
-        "SELECT id FROM sessions WHERE event_id = %s AND type = %s",
-        (event_id, session_type),
+        (event_id, event["session_type"], event["session_date"]),
     )
     return cur.fetchone()[0]
 
 
-def _insert_drivers(cur, session, year: int) -> dict[str, int]:
+def _insert_drivers(cur, drivers, year: int) -> dict[str, int]:
     """
     Insert drivers from a session into the database
 
     :param cur: Database cursor
-    :param session: FastF1 session object
+    :param drivers: Extracted drivers frame
     :param year: The season year
     :return: A dictionary mapping driver codes to their db ID.
     """
     driver_ids = {}
-    for _, driver in session.results.iterrows():
-        code = driver["Abbreviation"]
+    for code, name, team in drivers[["code", "name", "team"]].itertuples(index=False):
         cur.execute(
             """
             INSERT INTO drivers (code, name, team, season_year)
@@ -156,7 +290,7 @@ def _insert_drivers(cur, session, year: int) -> dict[str, int]:
             ON CONFLICT DO NOTHING
             RETURNING id
             """,
-            (code, driver["FullName"], driver["TeamName"], year),
+            (code, name, team, year),
         )
         row = cur.fetchone()
         if row:
@@ -170,74 +304,148 @@ def _insert_drivers(cur, session, year: int) -> dict[str, int]:
     return driver_ids
 
 
-def _insert_laps(cur, session, session_id: int, driver_ids: dict[str, int]):
+def _insert_laps(cur, laps, session_id: int, driver_ids: dict[str, int]):
     """
     Insert lap data from a session into the database.
 
     :param cur: Database cursor
-    :param session: FastF1 session object
+    :param laps: Extracted laps frame
     :param session_id: The session ID in the database
     :param driver_ids: Dictionary mapping driver codes to their db ID.
     """
-    laps = session.laps
-    for _, lap in laps.iterlaps():
-        driver = lap["Driver"]
-        if driver not in driver_ids:
-            continue
-        top_speed, throttle_pct, brakes = _get_telemetry(lap)
-        cur.execute(
-            """
-            INSERT INTO laps (session_id, driver_id, lap_number, lap_time,
-                              sector1, sector2, sector3, compound, tire_life,
-                              position, top_speed, full_throttle_pct, brake_count)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """,
-            (
-                session_id,
-                driver_ids[driver],
-                lap["LapNumber"],
-                _to_ms(lap["LapTime"]),
-                _to_ms(lap["Sector1Time"]),
-                _to_ms(lap["Sector2Time"]),
-                _to_ms(lap["Sector3Time"]),
-                lap.get("Compound"),
-                _safe_int(lap.get("TyreLife")),
-                _safe_int(lap.get("Position")),
-                top_speed,
-                throttle_pct,
-                brakes,
-            ),
-        )
+    from psycopg2.extras import execute_values
+
+    execute_values(
+        cur,
+        """
+        INSERT INTO laps (session_id, driver_id, lap_number, lap_time,
+                          sector1, sector2, sector3, compound, tire_life,
+                          position, top_speed, full_throttle_pct, brake_count)
+        VALUES %s
+        """,
+        _to_rows(_with_driver_ids(laps, driver_ids), session_id, LAP_COLUMNS),
+    )
 
 
-def _insert_pits(cur, session, session_id: int, driver_ids: dict[str, int]):
+def _insert_pits(cur, pit_stops, session_id: int, driver_ids: dict[str, int]):
     """
     Insert all pit stops from a session into the database.
 
     :param cur: Database cursor
-    :param session: FastF1 session object
+    :param pit_stops: Extracted pit stops frame
     :param session_id: The db ID of the session
     :param driver_ids: Dictionary mapping driver codes to their db ID.
     """
-    laps = session.laps
-    pit_laps = laps[laps["PitInTime"].notna()]
-    for _, lap in pit_laps.iterrows():
-        driver = lap["Driver"]
-        if driver not in driver_ids:
-            continue
-        pit_time = lap.get("PitOutTime") - lap.get("PitInTime")
-        cur.execute(
-            """
-            INSERT INTO pit_stops (session_id, driver_id, lap_number, duration)
-            VALUES (%s, %s, %s, %s)
-            """,
-            (
-                session_id,
-                driver_ids[driver],
-                lap["LapNumber"],
-                _to_ms(pit_time),
-            ),
-        )
+    from psycopg2.extras import execute_values
+
+    execute_values(
+        cur,
+        """
+        INSERT INTO pit_stops (session_id, driver_id, lap_number, duration)
+        VALUES %s
+        """,
+        _to_rows(_with_driver_ids(pit_stops, driver_ids), session_id, PIT_COLUMNS),
+    )
+
+
+def _transform_laps(laps):
+    """
+    Convert FastF1 laps to database-ready columns in whole-column operations.
+
+    :param laps: FastF1 laps frame
+    :return: A frame of driver codes and the lap columns, with nullable integers
+    """
+    import pandas as pd
+
+    return pd.DataFrame(
+        {
+            "driver": laps["Driver"],
+            "lap_number": _int_column(laps["LapNumber"]),
+            "lap_time": _ms_column(laps["LapTime"]),
+            "sector1": _ms_column(laps["Sector1Time"]),
+            "sector2": _ms_column(laps["Sector2Time"]),
+            "sector3": _ms_column(laps["Sector3Time"]),
+            "compound": laps["Compound"].where(laps["Compound"].notna(), None),
+            "tire_life": _int_column(laps["TyreLife"]),
+            "position": _int_column(laps["Position"]),
+        },
+        index=laps.index,
+    )
+
+
+def _transform_pits(laps):
+    """
+    Derive pit stops from FastF1 laps.
+
+    A stop starts at the PitInTime of a lap and ends at the PitOutTime of the
+    same driver's following lap.
+
+    :param laps: FastF1 laps frame
+    :return: A frame of driver codes, in-lap numbers and durations in ms
+    """
+    import pandas as pd
+
+    laps = laps.sort_values(["Driver", "LapNumber"])
+    pit_out = laps.groupby("Driver", sort=False)["PitOutTime"].shift(-1)
+    stops = laps["PitInTime"].notna()
+    return pd.DataFrame(
+        {
+            "driver": laps.loc[stops, "Driver"],
+            "lap_number": _int_column(laps.loc[stops, "LapNumber"]),
+            "duration": _ms_column(pit_out[stops] - laps.loc[stops, "PitInTime"]),
+        }
+    )
+
+
+def _with_driver_ids(frame, driver_ids: dict[str, int]):
+    """
+    Replace driver codes by their db ID, dropping rows of unknown drivers.
+
+    :param frame: A frame with a "driver" column of codes
+    :param driver_ids: Dictionary mapping driver codes to their db ID.
+    :return: The frame with a "driver_id" column instead of "driver"
+    """
+    import numpy as np
+    import pandas as pd
+
+    pos = pd.Index(list(driver_ids)).get_indexer(frame["driver"])
+    known = pos >= 0
+    ids = np.fromiter(driver_ids.values(), np.int64, len(driver_ids))
+    return frame[known].drop(columns="driver").assign(driver_id=ids[pos[known]])
+
+
+def _lap_telemetry(laps):
+    """
+    Compute the telemetry aggregates of every lap.
+
+    :param laps: FastF1 laps frame
+    :return: A frame of top_speed, full_throttle_pct and brake_count
+    """
+    import pandas as pd
+
+    rows = {i: _get_telemetry(lap) for i, lap in laps.iterlaps()}
+    return pd.DataFrame.from_dict(
+        rows,
+        orient="index",
+        columns=["top_speed", "full_throttle_pct", "brake_count"],
+    ).astype(
+        {"top_speed": "Int64", "full_throttle_pct": "Float64", "brake_count": "Int64"}
+    )
+
+
+def _to_rows(frame, session_id: int, columns: tuple[str, ...]) -> list[tuple]:
+    """
+    Turn a transformed frame into insert rows, with None for missing values.
+
+    :param frame: A frame with the given columns
+    :param session_id: The db ID of the session, prepended to every row
+    :param columns: The columns to insert, in order
+    :return: One tuple per row
+    """
+    values = frame.loc[:, list(columns)].astype(object)
+    values = values.where(frame.loc[:, list(columns)].notna(), None)
+    values.insert(0, "session_id", session_id)
+    return list(values.itertuples(index=False, name=None))
 
 
 def _get_telemetry(lap) -> tuple:
@@ -253,28 +461,39 @@ def _get_telemetry(lap) -> tuple:
         return None, None, None
 
 
-def _safe_int(val) -> int | None:
+def _int_column(values):
     """
-    Handle NaN and infinite values before giving them to the db.
+    Convert a numeric column to nullable integers.
 
-    :param val: A numeric value or NaN/inf
-    :return: The value as an integer, or None if the value is NaN, -inf or inf
+    :param values: A numeric Series, possibly with NaN or infinite values
+    :return: An Int64 Series, NA where the value was NaN, -inf or inf
     """
-    if pd.isna(val) or not np.isfinite(val):
-        return None
-    return int(val)
+    import numpy as np
+    import pandas as pd
 
+    floats = pd.to_numeric(values, errors="coerce").to_numpy(np.float64, na_value=np.nan)
+    missing = ~np.isfinite(floats)
+    ints = np.where(missing, 0, floats).astype(np.int64)
+    return pd.Series(pd.arrays.IntegerArray(ints, missing), index=values.index)
 
-def _to_ms(td) -> int | None:
+
+def _ms_column(values):
     """
-    Convert timedeltas to milliseconds.
+    Convert a timedelta column to milliseconds.
 
-    :param td: Timedelta or NaT
-    :return: The time in milliseconds as an int, None if td is NaT/NaN
+    :param values: A timedelta Series, possibly with NaT
+    :return: An Int64 Series of milliseconds, NA where the value was NaT
     """
-    if pd.isna(td):
-        return None
-    return int(td.total_seconds() * 1000)
+    import numpy as np
+    import pandas as pd
+
+    tds = pd.to_timedelta(values)
+    ns = tds.to_numpy("timedelta64[ns]").view(np.int64)
+    missing = tds.isna().to_numpy()
+    return pd.Series(
+        pd.arrays.IntegerArray(np.where(missing, 0, ns // 1_000_000), missing),
+        index=values.index,
+    )
 
 
 def import_season(year: int):
@@ -283,16 +502,28 @@ def import_season(year: int):
 
     :param year: The season year to import
     """
+    for event_name, st in season_sessions(year):
+        try:
+            import_session(year, event_name, st)
+        except Exception as e:
+            logger.warning(f"Skipped {event_name} {st}: {e}")
+
+
+def season_sessions(year: int):
+    """
+    Yield the event name and session type of every session of a season.
+
+    :param year: The season year
+    """
+    from fastf1 import get_event_schedule
+
+    _setup()
     sch = get_event_schedule(year, include_testing=False)
     types = ["S", "FP1", "FP2", "FP3", "Q", "SQ", "R"]
 
     for _, event in sch.iterrows():
-        event_name = event["EventName"]
         for st in types:
-            try:
-                import_session(year, event_name, st)
-            except Exception as e:
-                logger.warning(f"Skipped {event_name} {st}: {e}")
+            yield event["EventName"], st
 
 
 if __name__ == "__main__":
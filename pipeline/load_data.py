@@ -0,0 +1,64 @@
+# Load stage: bulk-load extracted Parquet session files into PostgreSQL.
+
+import argparse
+from logging import INFO, basicConfig, getLogger
+from pathlib import Path
+
+from pipeline.extract_data import EXTRACT_DIR
+from pipeline.import_data import FRAMES, load_frames
+
+basicConfig(level=INFO)
+logger = getLogger(__name__)
+
+
+def read_frames(path: Path) -> dict:
+    """
+    Read the Parquet files of one extracted session.
+
+    :param path: The session directory
+    :return: A frame for each of FRAMES
+    """
+    import pandas as pd
+
+    return {name: pd.read_parquet(path / f"{name}.parquet") for name in FRAMES}
+
+
+def load_session(path: str | Path) -> int:
+    """
+    Load an extracted session into the database, replacing its laps and pit stops.
+
+    :param path: The session directory
+    :return: The db ID of the session
+    """
+    session_id = load_frames(read_frames(Path(path)))
+    logger.info(f"Loaded: {path}")
+    return session_id
+
+
+def load_season(year: int, in_dir: str | Path = EXTRACT_DIR):
+    """
+    Load every extracted session of a season.
+
+    :param year: The season year
+    :param in_dir: Root directory of the extracts
+    """
+    season_dir = Path(in_dir, str(year))
+    if not season_dir.is_dir():
+        logger.warning(f"Skipped {year}: no extracts in {season_dir}")
+        return
+    for path in sorted(season_dir.iterdir()):
+        if not path.is_dir():
+            continue
+        try:
+            load_session(path)
+        except Exception as e:
+            logger.warning(f"Skipped {path}: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load extracted seasons")
+    parser.add_argument("years", type=int, nargs="+", help="Season years")
+    parser.add_argument("--input", default=EXTRACT_DIR, help="Extracts directory")
+    args = parser.parse_args()
+    for year in args.years:
+        load_season(year, args.input)
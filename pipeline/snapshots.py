@@ -0,0 +1,90 @@
+# Render static JSON snapshots of completed sessions for the API to serve.
+
+import argparse
+from datetime import UTC, datetime
+from logging import INFO, basicConfig, getLogger
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from backend.app.database import session_maker
+from backend.app.models import Event
+from backend.app.models import Session as SessionModel
+from backend.app.rest import seasons, sessions
+from backend.app.schemas import DriverResponse, EventResponse, LapDetailResponse
+from backend.app.snapshots import season_version, snapshot_version, write_snapshot
+
+basicConfig(level=INFO)
+logger = getLogger(__name__)
+
+_LAPS = TypeAdapter(list[LapDetailResponse])
+_DRIVERS = TypeAdapter(list[DriverResponse])
+_EVENTS = TypeAdapter(list[EventResponse])
+
+
+def _render(adapter: TypeAdapter, items) -> bytes:
+    return adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+
+
+def write_session_snapshots(db: Session, session_id: int) -> bool:
+    """
+    Render the laps and drivers of a completed session.
+
+    Sessions that have not taken place yet are skipped.
+
+    :param db: SQLAlchemy session
+    :param session_id: The session ID
+    :return: True if the snapshots were written
+    """
+    session = db.get(SessionModel, session_id)
+    # Session dates are stored as naive UTC
+    if session is None or session.date > datetime.now(UTC).replace(tzinfo=None):
+        return False
+
+    version = snapshot_version(session.loaded_at)
+    laps = sessions.aux_session_laps(db, session_id)
+    drivers = sessions.aux_session_drivers(db, session_id)
+    write_snapshot(_render(_LAPS, laps), version, "sessions", session_id, "laps")
+    write_snapshot(_render(_DRIVERS, drivers), version, "sessions", session_id, "drivers")
+    return True
+
+
+def write_season_snapshots(db: Session, year: int):
+    """
+    Render the events of a season.
+
+    :param db: SQLAlchemy session
+    :param year: The season year
+    """
+    events = seasons.aux_season_events(db, year)
+    version = season_version(db, year)
+    write_snapshot(_render(_EVENTS, events), version, "seasons", year, "events")
+
+
+def write_snapshots(years: list[int] | None = None):
+    """
+    Render snapshots of every completed session.
+
+    :param years: Only render these seasons, all if None
+    """
+    db = session_maker()
+    try:
+        query = db.query(SessionModel.id, Event.season_year).join(Event)
+        if years:
+            query = query.filter(Event.season_year.in_(years))
+        rendered = set()
+        for session_id, year in query.order_by(SessionModel.id).all():
+            if write_session_snapshots(db, session_id):
+                logger.info(f"Rendered snapshots of session {session_id}")
+                rendered.add(year)
+        for year in sorted(rendered):
+            write_season_snapshots(db, year)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render static JSON snapshots")
+    parser.add_argument("years", type=int, nargs="*", help="Season years (default all)")
+    args = parser.parse_args()
+    write_snapshots(args.years)
@@ -1,7 +1,10 @@
+from time import perf_counter
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 
-from backend.app.database import session_maker
+from backend.app.database import get_engine, session_maker
 from backend.app.main import app
 from backend.app.models import Driver, Event, Lap, Season, Session
 
@@ -86,3 +89,37 @@ def db():
 def client():
     """Return a TestClient to test the API endpoints"""
     return TestClient(app)
+
+
+class QueryCounter:
+    """Count SQL statements and the time spent running them"""
+
+    def __init__(self):
+        self.statements = []
+        self.elapsed = 0.0
+        self._start = 0.0
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def before(self, conn, cursor, statement, parameters, context, executemany):
+        self._start = perf_counter()
+
+    def after(self, conn, cursor, statement, parameters, context, executemany):
+        self.elapsed += perf_counter() - self._start
+        self.statements.append(statement)
+
+
+@pytest.fixture
+def queries():
+    """Return a QueryCounter listening on the engine for the duration of a test"""
+    counter = QueryCounter()
+    engine = get_engine()
+    event.listen(engine, "before_cursor_execute", counter.before)
+    event.listen(engine, "after_cursor_execute", counter.after)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter.before)
+        event.remove(engine, "after_cursor_execute", counter.after)
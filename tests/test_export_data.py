@@ -0,0 +1,33 @@
+import csv
+import gzip
+
+import pytest
+
+from pipeline.export_data import export_season
+from tests.conftest import TEST_YEAR
+
+
+def test_export_csv(tmp_path):
+    laps, pits = export_season(TEST_YEAR, tmp_path, session_types=["R"])
+    with gzip.open(laps, "rt") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["lap_number"] for r in rows] == ["1", "2", "3"]
+    assert all(r["driver"] == "TST" and r["session"] == "R" for r in rows)
+    with gzip.open(pits, "rt") as f:
+        assert list(csv.DictReader(f)) == []
+
+
+def test_export_csv_types(tmp_path):
+    laps, _ = export_season(TEST_YEAR, tmp_path, session_types=["FP1"])
+    with gzip.open(laps, "rt") as f:
+        assert list(csv.DictReader(f)) == []
+
+
+def test_export_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    laps, _ = export_season(TEST_YEAR, tmp_path, fmt="parquet", chunk_size=2)
+    file = pq.ParquetFile(laps)
+    assert file.metadata.num_row_groups == 2
+    table = file.read()
+    assert table.column("lap_number").to_pylist() == [1, 2, 3]
+    assert table.column("lap_time").to_pylist() == [90100, 90200, 90300]
@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from ml.features import COMPOUNDS, FEATURES, build_feature_matrix
+from tests.conftest import TEST_YEAR
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+def test_feature_matrix(chunk_size):
+    X, y, groups = build_feature_matrix([TEST_YEAR], chunk_size=chunk_size)
+    assert X.shape == (3, len(FEATURES))
+    assert y.tolist() == [90100, 90200, 90300]
+    assert len(set(groups.tolist())) == 1
+    assert X[:, FEATURES.index("lap_number")].tolist() == [1, 2, 3]
+    assert np.all(X[:, FEATURES.index("compound")] == COMPOUNDS.index("SOFT"))
+
+
+def test_feature_matrix_types():
+    X, y, _ = build_feature_matrix([TEST_YEAR], session_types=["Q"])
+    assert X.shape == (0, len(FEATURES))
+    assert len(y) == 0
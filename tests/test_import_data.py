@@ -0,0 +1,247 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastf1.core import Laps
+
+from backend.app.database import get_connection
+from backend.app.models import Lap, PitStop
+from backend.app.models import Session as SessionModel
+from pipeline.extract_data import write_frames
+from pipeline.import_data import (
+    FRAMES,
+    LAP_COLUMNS,
+    PIT_COLUMNS,
+    _to_rows,
+    _transform_laps,
+    _transform_pits,
+    _with_driver_ids,
+    extract_frames,
+    load_frames,
+)
+from pipeline.load_data import load_season, read_frames
+
+DRIVER_IDS = {"VER": 1, "HAM": 2, "LEC": 3}
+TIME_COLUMNS = [2, 3, 4, 5]
+LOAD_YEAR = 6768
+
+
+def _td(values):
+    return pd.Series(pd.to_timedelta(values, unit="ms"), dtype="timedelta64[ns]")
+
+
+def _laps(n=200, seed=0):
+    """Random FastF1-like laps with missing values sprinkled in"""
+    rng = np.random.default_rng(seed)
+    drivers = rng.choice(["VER", "HAM", "LEC", "UNK"], n)
+    lap_numbers = np.zeros(n)
+    for d in set(drivers):
+        lap_numbers[drivers == d] = np.arange(1, (drivers == d).sum() + 1)
+
+    def times(low, high, missing=0.1):
+        ms = rng.integers(low, high, n).astype(float)
+        ms[rng.random(n) < missing] = np.nan
+        return _td(ms)
+
+    tyre_life = rng.integers(1, 40, n).astype(float)
+    tyre_life[rng.random(n) < 0.1] = np.nan
+    position = rng.integers(1, 21, n).astype(float)
+    position[rng.random(n) < 0.05] = np.inf
+    compound = rng.choice(["SOFT", "MEDIUM", "HARD"], n).astype(object)
+    compound[rng.random(n) < 0.1] = None
+    pit_in = times(3_000_000, 4_000_000, missing=0.9)
+    pit_out = times(3_000_000, 4_000_000, missing=0.9)
+
+    return pd.DataFrame(
+        {
+            "Driver": drivers,
+            "LapNumber": lap_numbers,
+            "LapTime": times(60_000, 130_000),
+            "Sector1Time": times(20_000, 45_000),
+            "Sector2Time": times(20_000, 45_000),
+            "Sector3Time": times(20_000, 45_000),
+            "Compound": compound,
+            "TyreLife": tyre_life,
+            "Position": position,
+            "PitInTime": pit_in,
+            "PitOutTime": pit_out,
+        }
+    )
+
+
+def _legacy_ms(td):
+    if pd.isna(td):
+        return None
+    return int(td.total_seconds() * 1000)
+
+
+def _legacy_int(val):
+    if pd.isna(val) or not np.isfinite(val):
+        return None
+    return int(val)
+
+
+def _legacy_lap_rows(laps, session_id):
+    """Row-wise lap conversion, as done before the vectorized transform"""
+    rows = []
+    for _, lap in laps.iterrows():
+        if lap["Driver"] not in DRIVER_IDS:
+            continue
+        rows.append(
+            (
+                session_id,
+                DRIVER_IDS[lap["Driver"]],
+                lap["LapNumber"],
+                _legacy_ms(lap["LapTime"]),
+                _legacy_ms(lap["Sector1Time"]),
+                _legacy_ms(lap["Sector2Time"]),
+                _legacy_ms(lap["Sector3Time"]),
+                lap.get("Compound"),
+                _legacy_int(lap.get("TyreLife")),
+                _legacy_int(lap.get("Position")),
+            )
+        )
+    return rows
+
+
+def _legacy_pit_rows(laps, session_id):
+    """Row-wise pit stops, pairing an in-lap with the driver's next out-lap"""
+    rows = []
+    for i, lap in laps.iterrows():
+        if pd.isna(lap["PitInTime"]) or lap["Driver"] not in DRIVER_IDS:
+            continue
+        later = laps[(laps["Driver"] == lap["Driver"]) & (laps.index > i)]
+        pit_out = later["PitOutTime"].iloc[0] if len(later) else pd.NaT
+        rows.append(
+            (
+                session_id,
+                DRIVER_IDS[lap["Driver"]],
+                int(lap["LapNumber"]),
+                _legacy_ms(pit_out - lap["PitInTime"]),
+            )
+        )
+    return rows
+
+
+def test_laps_match_rowwise():
+    laps = _laps()
+    frame = _with_driver_ids(_transform_laps(laps), DRIVER_IDS)
+    rows = _to_rows(frame, 7, LAP_COLUMNS[:-3])
+    legacy = _legacy_lap_rows(laps, 7)
+    assert len(rows) == len(legacy)
+    for row, old in zip(rows, legacy):
+        for i, (new, ref) in enumerate(zip(row, old)):
+            if i in TIME_COLUMNS and ref is not None:
+                # The float-based conversion sometimes truncated 1 ms too many
+                assert new - ref in (0, 1)
+            else:
+                assert new == ref
+
+
+def test_pits_match_rowwise():
+    laps = _laps(seed=1)
+    frame = _with_driver_ids(_transform_pits(laps), DRIVER_IDS)
+    rows = _to_rows(frame, 7, PIT_COLUMNS)
+    assert sorted(rows) == sorted(_legacy_pit_rows(laps, 7))
+
+
+def test_exact_ms():
+    laps = _laps(n=4)
+    laps["LapTime"] = _td([64002, 90123, 1, np.nan])
+    laps["Driver"] = "VER"
+    frame = _transform_laps(laps)
+    assert frame["lap_time"].tolist() == [64002, 90123, 1, pd.NA]
+
+
+def test_pit_duration():
+    laps = _laps(n=3)
+    laps["Driver"] = ["HAM", "HAM", "VER"]
+    laps["LapNumber"] = [1.0, 2.0, 1.0]
+    laps["PitInTime"] = _td([100_000, np.nan, 50_000])
+    laps["PitOutTime"] = _td([np.nan, 122_500, np.nan])
+    rows = _to_rows(_with_driver_ids(_transform_pits(laps), DRIVER_IDS), 7, PIT_COLUMNS)
+    assert sorted(rows) == [(7, 1, 1, None), (7, 2, 1, 22_500)]
+
+
+def _session():
+    """A FastF1-like session object built from random laps"""
+    return SimpleNamespace(
+        name="Race",
+        date=pd.Timestamp("2025-04-01 15:00:00"),
+        event={
+            "RoundNumber": 3,
+            "EventName": "Load Grand Prix",
+            "Country": "Loadland",
+            "Location": "Load Circuit",
+            "EventDate": pd.Timestamp("2025-04-01"),
+        },
+        results=pd.DataFrame(
+            {
+                "Abbreviation": ["VER", "HAM", "LEC"],
+                "FullName": ["Driver One", "Driver Two", "Driver Three"],
+                "TeamName": ["Team A", "Team B", "Team C"],
+            }
+        ),
+        laps=Laps(_laps()),
+    )
+
+
+@pytest.fixture
+def load_year():
+    """A season year that is deleted again after the test"""
+    sessions = (
+        "SELECT s.id FROM sessions s JOIN events e ON e.id = s.event_id"
+        " WHERE e.season_year = %(year)s"
+    )
+    try:
+        yield LOAD_YEAR
+    finally:
+        con = get_connection()
+        with con, con.cursor() as cur:
+            for sql in (
+                f"DELETE FROM laps WHERE session_id IN ({sessions})",
+                f"DELETE FROM pit_stops WHERE session_id IN ({sessions})",
+                f"DELETE FROM sessions WHERE id IN ({sessions})",
+                "DELETE FROM events WHERE season_year = %(year)s",
+                "DELETE FROM drivers WHERE season_year = %(year)s",
+                "DELETE FROM seasons WHERE year = %(year)s",
+            ):
+                cur.execute(sql, {"year": LOAD_YEAR})
+        con.close()
+
+
+def test_extract_frames():
+    frames = extract_frames(_session(), LOAD_YEAR)
+    assert set(frames) == set(FRAMES)
+    assert frames["event"].iloc[0]["session_type"] == "R"
+    assert set(frames["laps"]["driver"]) == {"VER", "HAM", "LEC"}
+    assert frames["laps"]["top_speed"].isna().all()
+
+
+def test_parquet_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    frames = extract_frames(_session(), LOAD_YEAR)
+    write_frames(frames, tmp_path)
+    for name, frame in read_frames(tmp_path).items():
+        pd.testing.assert_frame_equal(frame, frames[name], check_dtype=False)
+
+
+def test_load_frames(db, load_year):
+    frames = extract_frames(_session(), load_year)
+    session_id = load_frames(frames)
+    loaded_at = db.get(SessionModel, session_id).loaded_at
+    db.rollback()
+    # Loading again replaces the laps instead of duplicating them
+    assert load_frames(frames) == session_id
+    # and retires the snapshots of the previous load
+    assert db.get(SessionModel, session_id).loaded_at > loaded_at
+    laps = db.query(Lap).filter(Lap.session_id == session_id).count()
+    assert laps == len(frames["laps"])
+    stops = db.query(PitStop).filter(PitStop.session_id == session_id).count()
+    assert stops == len(frames["pit_stops"])
+
+
+def test_load_season_missing(tmp_path, caplog):
+    load_season(LOAD_YEAR, tmp_path)
+    assert f"Skipped {LOAD_YEAR}" in caplog.text
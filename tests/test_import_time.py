@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ["fastf1", "pandas", "numpy", "psycopg2", "dotenv"]
+
+
+@pytest.mark.parametrize("module", ["backend.app.main", "pipeline.import_data"])
+def test_lazy_imports(module):
+    env = {k: v for k, v in os.environ.items() if not k.startswith("POSTGRES_")}
+    code = (
+        f"import sys, {module}\n"
+        "from backend.app.database import get_engine\n"
+        "assert get_engine.cache_info().currsize == 0\n"
+        f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == ""
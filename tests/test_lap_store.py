@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+from backend.app import lap_store
+from backend.app.database import LAPS_CHANGED_CHANNEL, get_connection
+from backend.app.lap_store import LapStore
+from backend.app.models import Session as SessionModel
+
+FILTERS = [
+    {},
+    {"driver": "tst"},
+    {"driver": "XXX"},
+    {"compound": "soft"},
+    {"compound": "HARD"},
+    {"lap_min": 2},
+    {"lap_min": 2, "lap_max": 2},
+    {"driver": "TST", "compound": "SOFT", "lap_max": 1},
+]
+
+
+def _get_session_id(db):
+    return db.query(SessionModel).first().id
+
+
+@pytest.fixture
+def store():
+    """A lap store with a 1 MB budget, its LISTEN connection closed afterwards"""
+    store = LapStore(1 << 20)
+    try:
+        yield store
+    finally:
+        store.close()
+
+
+@pytest.mark.parametrize("params", FILTERS)
+def test_store_matches_db(client, db, store, params):
+    sid = _get_session_id(db)
+    expected = client.get(f"/sessions/{sid}/laps", params=params).json()
+    laps = store.get(db, sid)
+    assert laps.filter(**params) == expected
+
+
+def test_store_endpoint(client, db, store, monkeypatch):
+    sid = _get_session_id(db)
+    expected = client.get(f"/sessions/{sid}/laps").json()
+    monkeypatch.setattr(lap_store, "get_lap_store", lambda: store)
+
+    assert client.get(f"/sessions/{sid}/laps").json() == expected
+    assert sid in store
+    assert client.get("/sessions/67676767/laps").status_code == 404
+
+
+def test_store_eviction(db, store):
+    sid = _get_session_id(db)
+    store.max_bytes = 0
+    assert store.get(db, sid) is not None
+    assert sid not in store
+    assert store.get(db, 67676767) is None
+
+
+def test_store_invalidation(db, store):
+    sid = _get_session_id(db)
+    first = store.get(db, sid)
+    assert store.get(db, sid) is first
+
+    con = get_connection()
+    con.autocommit = True
+    try:
+        con.cursor().execute("SELECT pg_notify(%s, %s)", (LAPS_CHANGED_CHANNEL, str(sid)))
+    finally:
+        con.close()
+    # Notifications arrive asynchronously, give the listener a moment
+    deadline = time.monotonic() + 5
+    while store.get(db, sid) is first and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert store.get(db, sid) is not first
+
+
+def test_store_close(db, store):
+    sid = _get_session_id(db)
+    store.get(db, sid)
+    listener = store._listener
+    store.close()
+    assert listener.closed
+    assert sid not in store
@@ -0,0 +1,38 @@
+import pytest
+
+from backend.app.models import Session as SessionModel
+from tests.conftest import TEST_YEAR
+
+# Route -> (expected status, max SQL statements, max DB time in ms)
+BUDGETS = {
+    "/seasons": (200, 1, 250),
+    f"/seasons/{TEST_YEAR}/events": (200, 1, 250),
+    f"/seasons/{TEST_YEAR}/drivers": (200, 1, 250),
+    "/seasons/1900/events": (404, 2, 250),
+    "/seasons/1900/drivers": (404, 2, 250),
+    "/sessions/{sid}/drivers": (200, 1, 250),
+    "/sessions/{sid}/laps": (200, 1, 250),
+    "/sessions/{sid}/laps?driver=TST&lap_min=2": (200, 1, 250),
+    "/sessions/67676767/drivers": (404, 2, 250),
+    "/sessions/67676767/laps": (404, 2, 250),
+    "/sessions/{sid}/race-trace": (200, 1, 250),
+    "/sessions/67676767/race-trace": (404, 2, 250),
+    "/sessions/laps?session_id={sid}": (200, 1, 250),
+    f"/sessions/laps?year={TEST_YEAR}&session_type=R": (200, 1, 250),
+}
+
+
+@pytest.fixture(scope="module")
+def sid(client, db):
+    # Warm up the pool so connection setup queries are not counted
+    client.get("/seasons")
+    return db.query(SessionModel).first().id
+
+
+@pytest.mark.parametrize("route", BUDGETS)
+def test_query_budget(client, sid, queries, route):
+    status, max_count, max_ms = BUDGETS[route]
+    resp = client.get(route.format(sid=sid))
+    assert resp.status_code == status
+    assert queries.count <= max_count, queries.statements
+    assert queries.elapsed * 1000 <= max_ms
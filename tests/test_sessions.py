@@ -1,5 +1,8 @@
-from backend.app.models import Lap
+from backend.app.database import get_db, session_maker
+from backend.app.main import app
+from backend.app.models import Driver, Lap
 from backend.app.models import Session as SessionModel
+from tests.conftest import TEST_YEAR
 
 
 def _get_session_id(db):
@@ -63,3 +66,116 @@ def test_wrong_session_l(client):
 def test_wrong_session_d(client):
     resp = client.get("/sessions/67676767/drivers")
     assert resp.status_code == 404
+
+
+def test_batch_laps(client, db):
+    sid = _get_session_id(db)
+    resp = client.get("/sessions/laps", params={"session_id": [sid, 67676767]})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [group["session_id"] for group in data] == [sid]
+    single = client.get(f"/sessions/{sid}/laps").json()
+    assert data[0]["laps"] == single
+
+
+def test_batch_laps_season(client):
+    resp = client.get(
+        "/sessions/laps",
+        params={"year": TEST_YEAR, "session_type": "R", "driver": "tst"},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert len(data) == 1
+    assert all(lap["driver_code"] == "TST" for lap in data[0]["laps"])
+
+
+def test_batch_laps_no_selector(client):
+    resp = client.get("/sessions/laps")
+    assert resp.status_code == 400
+
+
+def test_batch_laps_year_only(client):
+    resp = client.get("/sessions/laps", params={"year": TEST_YEAR})
+    assert resp.status_code == 400
+
+
+def test_race_trace(client, db):
+    sid = _get_session_id(db)
+    resp = client.get(f"/sessions/{sid}/race-trace")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["drivers"] == ["TST"]
+    assert data["laps"] == [1, 2, 3]
+    assert data["gaps"] == [[0, 0, 0]]
+    assert data["positions"] == [[1, 1, 1]]
+    assert data["positions_gained"] == [[None, 0, 0]]
+
+
+def _add_driver(db, sid, code, laps):
+    """Add a driver with (lap_number, lap_time, position) laps to a session"""
+    driver = Driver(code=code, name=code, team="Test Team", season_year=TEST_YEAR)
+    db.add(driver)
+    db.flush()
+    for number, lap_time, position in laps:
+        db.add(
+            Lap(
+                session_id=sid,
+                driver_id=driver.id,
+                lap_number=number,
+                lap_time=lap_time,
+                position=position,
+            )
+        )
+    db.flush()
+
+
+def _race_trace(client, db, sid):
+    """Fetch a race trace through an uncommitted session, rolled back afterwards"""
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        return client.get(f"/sessions/{sid}/race-trace").json()
+    finally:
+        app.dependency_overrides.clear()
+        db.rollback()
+        db.close()
+
+
+def test_race_trace_gaps(client):
+    db = session_maker()
+    sid = _get_session_id(db)
+    _add_driver(db, sid, "AAA", [(1, 91000, 2), (2, None, 3), (3, 90000, 2)])
+    data = _race_trace(client, db, sid)
+    assert data["drivers"] == ["AAA", "TST"]
+    # The rival's missing lap 2 leaves its cumulative time unknown from there on
+    assert data["gaps"] == [[900, None, None], [0, 0, 0]]
+    assert data["positions_gained"] == [[None, -1, 1], [None, 0, 0]]
+
+
+def test_race_trace_leader_missing_lap(client):
+    db = session_maker()
+    sid = _get_session_id(db)
+    db.query(Lap).filter(Lap.session_id == sid).update({Lap.position: 2})
+    _add_driver(db, sid, "AAA", [(1, 90000, 1), (2, None, 1), (3, 90000, 1)])
+    _add_driver(db, sid, "CCC", [(1, 90500, 3), (2, 90500, 3), (3, 90500, 3)])
+    data = _race_trace(client, db, sid)
+    assert data["drivers"] == ["AAA", "CCC", "TST"]
+    # Without the leader's total the gaps are unknown, not measured to P2
+    assert data["gaps"] == [[0, None, None], [500, None, None], [100, None, None]]
+
+
+def test_race_trace_untimed_lap(client):
+    db = session_maker()
+    sid = _get_session_id(db)
+    laps = db.query(Lap).filter(Lap.session_id == sid)
+    laps.filter(Lap.lap_number == 1).update({Lap.lap_time: None})
+    laps.update({Lap.position: 1})
+    _add_driver(db, sid, "AAA", [(1, None, 2), (2, 90500, 2), (3, 90500, 2)])
+    data = _race_trace(client, db, sid)
+    assert data["drivers"] == ["AAA", "TST"]
+    # Lap 1 has no time for anyone, the gaps are counted from lap 2
+    assert data["gaps"] == [[None, 300, 500], [None, 0, 0]]
+
+
+def test_wrong_session_rt(client):
+    resp = client.get("/sessions/67676767/race-trace")
+    assert resp.status_code == 404
@@ -0,0 +1,81 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import func
+
+from backend.app.models import Session as SessionModel
+from pipeline.snapshots import write_session_snapshots, write_snapshots
+from tests.conftest import TEST_YEAR
+
+
+@pytest.fixture
+def snapshots(client, db, monkeypatch, tmp_path):
+    """Render snapshots of the test season, return the matching DB responses"""
+    sid = db.query(SessionModel).first().id
+    routes = [
+        f"/sessions/{sid}/laps",
+        f"/sessions/{sid}/drivers",
+        f"/seasons/{TEST_YEAR}/events",
+    ]
+    expected = {route: client.get(route).json() for route in routes}
+    monkeypatch.setenv("SNAPSHOT_DIR", str(tmp_path))
+    write_snapshots([TEST_YEAR])
+    return sid, expected
+
+
+def test_snapshots_served(client, snapshots, queries):
+    _, expected = snapshots
+    for route, data in expected.items():
+        resp = client.get(route)
+        assert resp.status_code == 200
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.json() == data
+    # Only the version lookup hits the database
+    assert queries.count == len(expected)
+
+
+def test_snapshots_stale(client, snapshots, db, tmp_path):
+    sid, expected = snapshots
+    route = f"/sessions/{sid}/laps"
+    # A reload stamps the session, even when it does not render snapshots
+    db.query(SessionModel).filter(SessionModel.id == sid).update(
+        {SessionModel.loaded_at: func.now()}
+    )
+    db.commit()
+    for path in expected:
+        assert "content-encoding" not in client.get(path).headers
+
+    write_snapshots([TEST_YEAR])
+    resp = client.get(route)
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.json() == expected[route]
+    assert len(list(tmp_path.glob(f"sessions/{sid}/laps.*.json.gz"))) == 1
+
+
+def test_snapshots_fallback(client, snapshots, queries):
+    sid, _ = snapshots
+    resp = client.get(f"/sessions/{sid}/laps", params={"lap_min": 2})
+    assert resp.status_code == 200
+    assert [lap["lap_number"] for lap in resp.json()] == [2, 3]
+    assert "content-encoding" not in resp.headers
+
+    resp = client.get(f"/sessions/{sid}/laps", headers={"Accept-Encoding": "identity"})
+    assert resp.status_code == 200
+    assert "content-encoding" not in resp.headers
+
+    assert client.get("/sessions/67676767/laps").status_code == 404
+    assert queries.count > 0
+
+
+@pytest.mark.parametrize(("hours", "written"), [(-1, True), (1, False)])
+def test_snapshots_future_session(db, monkeypatch, tmp_path, hours, written):
+    monkeypatch.setenv("SNAPSHOT_DIR", str(tmp_path))
+    session = db.query(SessionModel).first()
+    # Within hours of now, so a naive local clock would get it wrong off UTC
+    session.date = datetime.now(UTC).replace(tzinfo=None) + timedelta(hours=hours)
+    db.flush()
+    try:
+        assert write_session_snapshots(db, session.id) is written
+    finally:
+        db.rollback()
+    assert any(tmp_path.rglob("*.json.gz")) is written